@@ -1447,7 +1447,11 @@ class IntervenableModel(BaseModel):
                 # set version for stateful models
                 self._intervention_state[key].inc_getter_version()
 
-            handlers.append(module_hook(hook_callback, with_kwargs=True))
+            handlers.append(
+                register_module_hook(
+                    self.model, module_hook, hook_callback, with_kwargs=True
+                )
+            )
 
         return HandlerList(handlers)
 
@@ -1594,7 +1598,7 @@ class IntervenableModel(BaseModel):
                     # TODO: this is a little hacky, we should probably refactor this
                     #       it is just to prevent tests to fail.
                     if len(intervention_additional_kwargs) > 0:
-                        intervened_representation = do_intervention(
+                        intervened_representation = do_intervention_compiled(
                             selected_output,
                             None,
                             intervention,
@@ -1602,7 +1606,7 @@ class IntervenableModel(BaseModel):
                             **intervention_additional_kwargs,
                         )
                     else:
-                        intervened_representation = do_intervention(
+                        intervened_representation = do_intervention_compiled(
                             selected_output,
                             None,
                             intervention,
@@ -1623,7 +1627,7 @@ class IntervenableModel(BaseModel):
                     if not isinstance(self.interventions[key], LambdaIntervention):
                         if intervention.is_source_constant:
                             if len(intervention_additional_kwargs) > 0:
-                                raw_intervened_representation = do_intervention(
+                                raw_intervened_representation = do_intervention_compiled(
                                     selected_output,
                                     None,
                                     intervention,
@@ -1631,7 +1635,7 @@ class IntervenableModel(BaseModel):
                                     **intervention_additional_kwargs,
                                 )
                             else:
-                                raw_intervened_representation = do_intervention(
+                                raw_intervened_representation = do_intervention_compiled(
                                     selected_output,
                                     None,
                                     intervention,
@@ -1643,7 +1647,7 @@ class IntervenableModel(BaseModel):
                             else:
                                 intervened_representation = raw_intervened_representation
                         else:
-                            intervened_representation = do_intervention(
+                            intervened_representation = do_intervention_compiled(
                                 selected_output,
                                 self._reconcile_stateful_cached_activations(
                                     key,
@@ -1655,7 +1659,7 @@ class IntervenableModel(BaseModel):
                             )
                     else:
                         # highly unlikely it's a primitive intervention type
-                        intervened_representation = do_intervention(
+                        intervened_representation = do_intervention_compiled(
                             selected_output,
                             self._reconcile_stateful_cached_activations(
                                 key,
@@ -1685,7 +1689,11 @@ class IntervenableModel(BaseModel):
                             
                     self._intervention_state[key].inc_setter_version()
 
-            handlers.append(module_hook(hook_callback, with_kwargs=True))
+            handlers.append(
+                register_module_hook(
+                    self.model, module_hook, hook_callback, with_kwargs=True
+                )
+            )
 
         return HandlerList(handlers)
 
@@ -2302,6 +2310,9 @@ class IntervenableModel(BaseModel):
         Notes:
         1) we use Adam, and linear lr scheduling.
         2) you can pass in lr or using default 1e-3
+        3) with PYVENE_COMPILE_INTERVENTION=1 (set before `import pyvene`),
+           you can pass in compile_cache_path to reuse torch.compile
+           artifacts across runs
         """
         # preprocess basic kwargs
         lr = kwargs["lr"] if "lr" in kwargs else 1e-3
@@ -2340,6 +2351,12 @@ class IntervenableModel(BaseModel):
             .to(self.get_device())
         )
 
+        # reuse compiled interventions from previous runs if enabled
+        compile_cache_path = (
+            kwargs["compile_cache_path"] if "compile_cache_path" in kwargs else None
+        )
+        load_compile_cache_artifacts(compile_cache_path)
+
         # train main loop
         remove_forward_hooks(self.model)
         self.model.eval()  # train enables drop-off but no grads
@@ -2377,6 +2394,8 @@ class IntervenableModel(BaseModel):
                         self.set_temperature(temperature_schedule[total_step])
                 total_step += 1
 
+        save_compile_cache_artifacts(compile_cache_path)
+
     def eval_alignment(
         self,
         eval_dataloader,
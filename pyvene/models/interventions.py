@@ -25,6 +25,9 @@ class Intervention(torch.nn.Module):
 
     """Intervention the original representations."""
 
+    # default for subclasses that skip super().__init__
+    keep_last_dim = False
+
     def __init__(self, **kwargs):
         super().__init__()
         self.trainable = False
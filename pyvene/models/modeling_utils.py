@@ -1,6 +1,7 @@
-import random, torch, types
+import functools, os, random, torch, types, weakref
 import numpy as np
 from torch import nn
+from typing import Optional, Tuple
 from .intervenable_modelcard import *
 from .interventions import *
 from .constants import *
@@ -21,12 +22,24 @@ class LambdaIntervention(torch.nn.Module):
         return self.func(*args, **kwargs)
 
 
+_model_type_cache: "weakref.WeakKeyDictionary[nn.Module, type]" = weakref.WeakKeyDictionary()
+
+
 def get_internal_model_type(model):
     """Return the model type."""
     # return type(model)
+    try:
+        return _model_type_cache[model]
+    except (KeyError, TypeError):
+        pass
     # Correct minor type mismatches
     for known_type in type_to_dimension_mapping:
         if isinstance(model, known_type):
+            try:
+                _model_type_cache[model] = known_type
+            except TypeError:
+                # not weak-referenceable, skip caching
+                pass
             return known_type
     raise ValueError(f"Unknown model type: {type(model)}")
 
@@ -40,29 +53,24 @@ def is_stateless(model):
     return True
 
 
+_GRU_TYPES = frozenset({GRUModel, GRULMHeadModel, GRUForClassification})
+_MLP_TYPES = frozenset({MLPModel, MLPForClassification})
+_NON_TRANSFORMER_TYPES = _GRU_TYPES | _MLP_TYPES
+
+
 def is_gru(model):
     """Determine if this is a transformer model."""
-    if (
-        type(model) == GRUModel
-        or type(model) == GRULMHeadModel
-        or type(model) == GRUForClassification
-    ):
-        return True
-    return False
+    return type(model) in _GRU_TYPES
 
 
 def is_mlp(model):
     """Determine if this is a mlp model."""
-    if type(model) == MLPModel or type(model) == MLPForClassification:
-        return True
-    return False
+    return type(model) in _MLP_TYPES
 
 
 def is_transformer(model):
     """Determine if this is a transformer model."""
-    if not is_gru(model) and not is_mlp(model):
-        return True
-    return False
+    return type(model) not in _NON_TRANSFORMER_TYPES
 
 
 def print_forward_hooks(main_module):
@@ -73,47 +81,115 @@ def print_forward_hooks(main_module):
             for hook_id, hook in submodule._forward_hooks.items():
                 print(f"  ID: {hook_id}, Hook: {hook}")
 
-        if hasattr(submodule, "_forward_pre_hooks") and submodule._forward_hooks:
+        if hasattr(submodule, "_forward_pre_hooks") and submodule._forward_pre_hooks:
             print(f"Module: {name if name else 'Main Module'}")
             for hook_id, hook in submodule._forward_pre_hooks.items():
                 print(f"  ID: {hook_id}, Hook: {hook}")
 
 
+# sub-modules that this library registered hooks on, keyed by the main module
+_hooked_modules: "weakref.WeakKeyDictionary[nn.Module, weakref.WeakSet]" = (
+    weakref.WeakKeyDictionary()
+)
+
+
+def register_module_hook(main_module, module_hook, hook, **kwargs):
+    """Register `hook` with a bound hook registration method of a sub-module
+    of `main_module`, e.g. `register_forward_hook`, and track the sub-module
+    so that `remove_forward_hooks` only needs to visit hooked sub-modules.
+    """
+    handler = module_hook(hook, **kwargs)
+    if main_module not in _hooked_modules:
+        _hooked_modules[main_module] = weakref.WeakSet()
+    _hooked_modules[main_module].add(module_hook.__self__)
+    return handler
+
+
 def remove_forward_hooks(main_module: nn.Module):
-    """Function to remove all forward and pre-forward hooks from a module and
+    """Function to remove forward and pre-forward hooks from a module and
 
     its sub-modules.
+
+    If hooks were registered on sub-modules of `main_module` through
+    `register_module_hook`, only those tracked sub-modules are cleared (of all
+    their forward and pre-forward hooks); hooks that other code registered on
+    untracked sub-modules are kept. Otherwise, all forward and pre-forward
+    hooks are removed from `main_module` and all of its sub-modules.
     """
+    if main_module in _hooked_modules:
+        # only visit the sub-modules we have registered hooks on
+        for submodule in list(_hooked_modules[main_module]):
+            submodule._forward_hooks.clear()
+            submodule._forward_pre_hooks.clear()
+        return
 
     # Remove forward hooks
     for _, submodule in main_module.named_modules():
         if hasattr(submodule, "_forward_hooks"):
-            hooks = list(submodule._forward_hooks.keys())  # Get a list of hook IDs
-            for hook_id in hooks:
-                submodule._forward_hooks.pop(hook_id)
+            submodule._forward_hooks.clear()
 
         # Remove pre-forward hooks
         if hasattr(submodule, "_forward_pre_hooks"):
-            pre_hooks = list(
-                submodule._forward_pre_hooks.keys()
-            )  # Get a list of pre-hook IDs
-            for pre_hook_id in pre_hooks:
-                submodule._forward_pre_hooks.pop(pre_hook_id)
+            submodule._forward_pre_hooks.clear()
 
 
-def getattr_for_torch_module(model, parameter_name):
-    """Recursively fetch the model based on the name."""
-    current_module = model
+@functools.lru_cache(maxsize=1024)
+def _compile_path(parameter_name) -> Tuple[Tuple[str, Optional[int]], ...]:
+    """Parse a dotted parameter name, e.g. "h[0].attn", into access steps."""
+    steps = []
     for param in parameter_name.split("."):
         if "[" in param:
-            current_module = getattr(current_module, param.split("[")[0])[
-                int(param.split("[")[-1].strip("]"))
-            ]
+            steps.append(
+                (param.split("[")[0], int(param.split("[")[-1].strip("]")))
+            )
         else:
-            current_module = getattr(current_module, param)
+            steps.append((param, None))
+    return tuple(steps)
+
+
+def getattr_for_torch_module(model, parameter_name):
+    """Recursively fetch the model based on the name."""
+    current_module = model
+    for name, index in _compile_path(parameter_name):
+        current_module = getattr(current_module, name)
+        if index is not None:
+            current_module = current_module[index]
     return current_module
 
 
+def _parse_dimension_proposal(proposal):
+    """Parse a dimension proposal, e.g. "n_embd*4" or "n_embd/n_head", into
+    an (op, left, right) tuple whose operands are ints or config attribute names.
+    """
+    if proposal.isnumeric():
+        return ("const", int(proposal), None)
+    elif "*" in proposal:
+        return ("mul", proposal.split("*")[0], int(proposal.split("*")[1]))
+    elif "/" in proposal:
+        numr, denr = proposal.split("/")[0], proposal.split("/")[1]
+        return (
+            "div",
+            int(numr) if numr.isnumeric() else numr,
+            int(denr) if denr.isnumeric() else denr,
+        )
+    return ("attr", proposal, None)
+
+
+@functools.lru_cache(maxsize=None)
+def _compile_proposals(model_type, component):
+    """Parse the static dimension proposals of a component once."""
+    return tuple(
+        _parse_dimension_proposal(proposal)
+        for proposal in type_to_dimension_mapping[model_type][component]
+    )
+
+
+def _resolve_proposal_operand(model_config, operand):
+    if isinstance(operand, int):
+        return operand
+    return getattr_for_torch_module(model_config, operand)
+
+
 def get_dimension_by_component(model_type, model_config, component) -> int:
     """Based on the representation, get the aligning dimension size."""
 
@@ -126,29 +202,19 @@ def get_dimension_by_component(model_type, model_config, component) -> int:
     if component not in type_to_dimension_mapping[model_type]:
         return None
 
-    dimension_proposals = type_to_dimension_mapping[model_type][component]
-    for proposal in dimension_proposals:
-        if proposal.isnumeric():
-            dimension = int(proposal)
-        elif "*" in proposal:
+    for op, left, right in _compile_proposals(model_type, component):
+        if op == "const":
+            dimension = left
+        elif op == "mul":
             # often constant multiplier with MLP
-            dimension = getattr_for_torch_module(
-                model_config, proposal.split("*")[0]
-            ) * int(proposal.split("*")[1])
-        elif "/" in proposal:
+            dimension = getattr_for_torch_module(model_config, left) * right
+        elif op == "div":
             # often split by head number
-            if proposal.split("/")[0].isnumeric():
-                numr = int(proposal.split("/")[0])
-            else:
-                numr = getattr_for_torch_module(model_config, proposal.split("/")[0])
-
-            if proposal.split("/")[1].isnumeric():
-                denr = int(proposal.split("/")[1])
-            else:
-                denr = getattr_for_torch_module(model_config, proposal.split("/")[1])
+            numr = _resolve_proposal_operand(model_config, left)
+            denr = _resolve_proposal_operand(model_config, right)
             dimension = int(numr / denr)
         else:
-            dimension = getattr_for_torch_module(model_config, proposal)
+            dimension = getattr_for_torch_module(model_config, left)
         if dimension is not None:
             return dimension
 
@@ -157,12 +223,13 @@ def get_dimension_by_component(model_type, model_config, component) -> int:
 
 def get_module_hook(model, representation, backend="native") -> nn.Module:
     """Render the intervening module with a hook."""
+    model_type = get_internal_model_type(model)
     if (
-        get_internal_model_type(model) in type_to_module_mapping and
+        model_type in type_to_module_mapping and
         representation.component
-        in type_to_module_mapping[get_internal_model_type(model)]
+        in type_to_module_mapping[model_type]
     ):
-        type_info = type_to_module_mapping[get_internal_model_type(model)][
+        type_info = type_to_module_mapping[model_type][
             representation.component
         ]
         parameter_name = type_info[0]
@@ -233,7 +300,7 @@ def bhsd_to_bs_hd(tensor):
     if tensor is None:
         return tensor
     b, h, s, d = tensor.shape
-    return tensor.permute(0, 2, 1, 3).reshape(b, s, h * d)
+    return tensor.transpose(1, 2).contiguous().view(b, s, h * d)
 
 
 def bs_hd_to_bhsd(tensor, h):
@@ -244,7 +311,38 @@ def bs_hd_to_bhsd(tensor, h):
 
     d = hd // h
 
-    return tensor.reshape(b, s, h, d).permute(0, 2, 1, 3)
+    return tensor.reshape(b, s, h, d).transpose(1, 2)
+
+
+def _identity_flatten(tensor):
+    return tensor
+
+
+def _identity_unflatten(tensor, num_unit):
+    return tensor
+
+
+# (flatten, unflatten) pairs keyed by the number of dims of the representation
+_flatten_dispatch = {
+    # no pos dimension, e.g., gru
+    2: (_identity_flatten, _identity_unflatten),
+    # b, num_unit (pos), d -> b, num_unit*d
+    3: (bsd_to_b_sd, b_sd_to_bsd),
+    # b, num_unit (h), s, d -> b, s, num_unit*d
+    4: (bhsd_to_bs_hd, bs_hd_to_bhsd),
+}
+
+
+def _get_flatten_fns(intervention, ndim):
+    """Return the (flatten, unflatten) functions for an intervention input."""
+    keep_last_dim = isinstance(
+        intervention, LocalistRepresentationIntervention
+    ) or getattr(intervention, "keep_last_dim", False)
+    if keep_last_dim:
+        # opt-out concate last two dims
+        return _flatten_dispatch[2]
+    assert ndim in _flatten_dispatch  # what's going on?
+    return _flatten_dispatch[ndim]
 
 
 def output_to_subcomponent(output, component, model_type, model_config):
@@ -258,18 +356,80 @@ def output_to_subcomponent(output, component, model_type, model_config):
     :param model_config: Hugging Face Model Config
     """
     subcomponent = output
-    if model_type in type_to_module_mapping and \
-        component in type_to_module_mapping[model_type]:
-        split_last_dim_by = type_to_module_mapping[model_type][component][2:]
-        if len(split_last_dim_by) != 0 and len(split_last_dim_by) > 2:
-            raise ValueError(f"Unsupported {split_last_dim_by}.")
-        for i, (split_fn, param) in enumerate(split_last_dim_by):
-            if isinstance(param, str):
-                param = get_dimension_by_component(model_type, model_config, param)
-            subcomponent = split_fn(subcomponent, param)
+    for split_fn, param in _resolve_split_last_dim_by(
+        type_to_module_mapping.get(model_type, {}).get(component),
+        model_type,
+        model_config,
+    ):
+        subcomponent = split_fn(subcomponent, param)
     return subcomponent
 
 
+def _resolve_split_last_dim_by(module_mapping, model_type, model_config):
+    """Return the (split_fn, param) steps of a component with resolved params.
+
+    :param module_mapping: the `type_to_module_mapping` entry of the component,
+    or None if the component is a direct reference.
+    """
+    if module_mapping is None:
+        return ()
+    split_last_dim_by = module_mapping[2:]
+    if len(split_last_dim_by) != 0 and len(split_last_dim_by) > 2:
+        raise ValueError(f"Unsupported {split_last_dim_by}.")
+    resolved = []
+    for split_fn, param in split_last_dim_by:
+        if isinstance(param, str):
+            param = get_dimension_by_component(model_type, model_config, param)
+        resolved.append((split_fn, param))
+    return tuple(resolved)
+
+
+@functools.lru_cache(maxsize=1024)
+def _component_slice(split_last_dim_by, last_dim_size):
+    """Locate a subcomponent within the last dimension of its module output.
+
+    :param split_last_dim_by: resolved (split_fn, param) steps of the component.
+    :param last_dim_size: size of the last dimension of the module output.
+    :return (start_index, end_index, num_heads, last_dim) where num_heads is 1
+    if the component is not split by heads.
+    """
+    meta_component = torch.arange(last_dim_size).unsqueeze(dim=0).unsqueeze(dim=0)
+    for split_fn, param in split_last_dim_by:
+        meta_component = split_fn(meta_component, param)
+    # splits only select contiguous chunks of the arange, so the flattened
+    # subcomponent stays increasing and its ends are the min and max.
+    flat_component = meta_component.reshape(-1)
+    start_index, end_index = int(flat_component[0]), int(flat_component[-1]) + 1
+    return start_index, end_index, meta_component.shape[1], meta_component.shape[-1]
+
+
+def locations_to_index_tensor(locations, device):
+    """Build a long index tensor from (nested lists of) locations on `device`.
+
+    For CUDA targets the host tensor is pinned first, so the host-to-device
+    copy is issued asynchronously instead of blocking the default stream.
+    """
+    index = torch.as_tensor(locations, dtype=torch.long)
+    device = torch.device(device)
+    if device.type == "cuda" and index.device.type == "cpu":
+        return index.pin_memory().to(device, non_blocking=True)
+    return index.to(device)
+
+
+def _is_shared_across_batch(unit_locations_as_list, batch_size):
+    """Whether every example in the batch uses the same list of locations."""
+    return (
+        isinstance(unit_locations_as_list, list)
+        and len(unit_locations_as_list) == batch_size
+        and batch_size > 0
+        and isinstance(unit_locations_as_list[0], list)
+        and all(
+            locations == unit_locations_as_list[0]
+            for locations in unit_locations_as_list
+        )
+    )
+
+
 def gather_neurons(tensor_input, unit, unit_locations_as_list, device=None):
     """Gather intervening neurons.
 
@@ -287,40 +447,39 @@ def gather_neurons(tensor_input, unit, unit_locations_as_list, device=None):
     if unit in {"t"}:
         return tensor_input
 
+    device = tensor_input.device if device is None else device
     if "." in unit:
         unit_locations = (
-            torch.tensor(unit_locations_as_list[0], 
-                         device=tensor_input.device if device is None else device),
-            torch.tensor(unit_locations_as_list[1], 
-                         device=tensor_input.device if device is None else device),
+            locations_to_index_tensor(unit_locations_as_list[0], device),
+            locations_to_index_tensor(unit_locations_as_list[1], device),
         )
         # we assume unit_locations is a tuple
         head_unit_locations = unit_locations[0]
         pos_unit_locations = unit_locations[1]
 
+        _, _, s, d = tensor_input.shape
         head_tensor_output = torch.gather(
             tensor_input,
             1,
-            head_unit_locations.reshape(
-                *head_unit_locations.shape, *(1,) * (len(tensor_input.shape) - 2)
-            ).expand(-1, -1, *tensor_input.shape[2:]),
-        )  # b, h, s, d
-        d = head_tensor_output.shape[1]
-        pos_tensor_input = bhsd_to_bs_hd(head_tensor_output)
-        pos_tensor_output = torch.gather(
-            pos_tensor_input,
-            1,
-            pos_unit_locations.reshape(
-                *pos_unit_locations.shape, *(1,) * (len(pos_tensor_input.shape) - 2)
-            ).expand(-1, -1, *pos_tensor_input.shape[2:]),
-        )  # b, num_unit (pos), num_unit (h)*d
-        tensor_output = bs_hd_to_bhsd(pos_tensor_output, d)
+            head_unit_locations[:, :, None, None].expand(-1, -1, s, d),
+        )  # b, num_unit (h), s, d
+        # gather positions directly on the (b, h, s, d) layout to avoid
+        # permuting to (b, s, h*d) and back.
+        num_head_unit = head_tensor_output.shape[1]
+        tensor_output = torch.gather(
+            head_tensor_output,
+            2,
+            pos_unit_locations[:, None, :, None].expand(-1, num_head_unit, -1, d),
+        )
 
         return tensor_output  # b, num_unit (h), num_unit (pos), d
     else:
-        unit_locations = torch.tensor(
-            unit_locations_as_list, device=tensor_input.device if device is None else device
-        )
+        if _is_shared_across_batch(unit_locations_as_list, tensor_input.shape[0]):
+            # same locations for every example, select them once
+            return tensor_input.index_select(
+                1, locations_to_index_tensor(unit_locations_as_list[0], device)
+            )
+        unit_locations = locations_to_index_tensor(unit_locations_as_list, device)
 
         tensor_output = torch.gather(
             tensor_input,
@@ -365,33 +524,25 @@ def scatter_neurons(
     :param use_fast: whether to use fast path (TODO: fast path condition)
     :return the in-place modified tensor_input
     """
+    device = tensor_input.device if device is None else device
     if "." in unit:
         # extra dimension for multi-level intervention
         unit_locations = (
-            torch.tensor(unit_locations_as_list[0], 
-                         device=tensor_input.device if device is None else device),
-            torch.tensor(unit_locations_as_list[1], 
-                         device=tensor_input.device if device is None else device),
+            locations_to_index_tensor(unit_locations_as_list[0], device),
+            locations_to_index_tensor(unit_locations_as_list[1], device),
         )
     else:
-        unit_locations = torch.tensor(
-            unit_locations_as_list, 
-            device=tensor_input.device if device is None else device
-        )
+        unit_locations = locations_to_index_tensor(unit_locations_as_list, device)
 
+    module_mapping = type_to_module_mapping.get(model_type, {}).get(component)
     # if tensor is splitted, we need to get the start and end indices
-    meta_component = output_to_subcomponent(
-        torch.arange(tensor_input.shape[-1]).unsqueeze(dim=0).unsqueeze(dim=0),
-        component,
-        model_type,
-        model_config,
+    start_index, end_index, num_heads, last_dim = _component_slice(
+        _resolve_split_last_dim_by(module_mapping, model_type, model_config),
+        tensor_input.shape[-1],
     )
-    start_index, end_index = (
-        meta_component.min().tolist(),
-        meta_component.max().tolist() + 1,
-    )
-    last_dim = meta_component.shape[-1]
-    _batch_idx = torch.arange(tensor_input.shape[0]).unsqueeze(1)
+    _batch_idx = torch.arange(
+        tensor_input.shape[0], device=tensor_input.device
+    ).unsqueeze(1)
 
     # in case it is time step, there is no sequence-related index
     if unit in {"t"}:
@@ -412,44 +563,49 @@ def scatter_neurons(
     elif unit in {"h", "h.pos"}:
         # head-based scattering is only special for transformer-based model
         # replacing_tensor_input: b_s, num_h, s, h_dim -> b_s, s, num_h*h_dim
-        old_shape = tensor_input.size()  # b_s, s, -1*num_h*d
         new_shape = tensor_input.size()[:-1] + (
             -1,
-            meta_component.shape[1],
+            num_heads,
             last_dim,
         )  # b_s, s, -1, num_h, d
         # get whether split by QKV
         if (
-            component in type_to_module_mapping[model_type]
-            and len(type_to_module_mapping[model_type][component]) > 2
-            and type_to_module_mapping[model_type][component][2][0] == split_three
+            module_mapping is not None
+            and len(module_mapping) > 2
+            and module_mapping[2][0] is split_three
         ):
-            _slice_idx = type_to_module_mapping[model_type][component][2][1]
+            _slice_idx = module_mapping[2][1]
         else:
             _slice_idx = 0
-        tensor_permute = tensor_input.view(new_shape)  # b_s, s, -1, num_h, d
-        tensor_permute = tensor_permute.permute(0, 3, 2, 1, 4)  # b_s, num_h, -1, s, d
+        # index the (b_s, s, -1, num_h, d) view directly instead of permuting
+        # heads in front of positions and back, writes go to tensor_input.
+        tensor_view = tensor_input.view(new_shape)  # b_s, s, -1, num_h, d
         if "." in unit:
-            # cannot advance indexing on two columns, thus a single for loop is unavoidable.
-            for i in range(unit_locations[0].shape[-1]):
-                tensor_permute[
-                    _batch_idx, unit_locations[0][:, [i]], _slice_idx, unit_locations[1]
-                ] = replacing_tensor_input[:, i]
+            # broadcast head and position indices against each other so that
+            # all (head, pos) pairs are written in a single indexed assignment.
+            num_head_unit = unit_locations[0].shape[-1]
+            tensor_view[
+                _batch_idx.unsqueeze(-1),
+                unit_locations[1].unsqueeze(1),
+                _slice_idx,
+                unit_locations[0].unsqueeze(-1),
+            ] = replacing_tensor_input[:, :num_head_unit]  # b_s, num_h, s, d
         else:
-            tensor_permute[
-                _batch_idx, unit_locations, _slice_idx
-            ] = replacing_tensor_input
-        # permute back and reshape
-        tensor_output = tensor_permute.permute(0, 3, 2, 1, 4)  # b_s, s, -1, num_h, d
-        tensor_output = tensor_output.view(old_shape)  # b_s, s, -1*num_h*d
-        return tensor_output
+            # the slice over s separates the advanced indices, so the indexed
+            # dims (b_s, num_h) come first, matching replacing_tensor_input.
+            tensor_view[
+                _batch_idx, :, _slice_idx, unit_locations
+            ] = replacing_tensor_input  # b_s, num_h, s, d
+        return tensor_input
     else:
         if "." in unit:
-            # cannot advance indexing on two columns, thus a single for loop is unavoidable.
-            for i in range(unit_locations[0].shape[-1]):
-                tensor_input[
-                    _batch_idx, unit_locations[0][:, [i]], unit_locations[1]
-                ] = replacing_tensor_input[:, i]
+            # broadcast both unit indices against each other, see above.
+            num_head_unit = unit_locations[0].shape[-1]
+            tensor_input[
+                _batch_idx.unsqueeze(-1),
+                unit_locations[0].unsqueeze(-1),
+                unit_locations[1].unsqueeze(1),
+            ] = replacing_tensor_input[:, :num_head_unit]
         else:
             tensor_input[_batch_idx, unit_locations] = replacing_tensor_input
         return tensor_input
@@ -474,23 +630,11 @@ def do_intervention(
     num_unit = base_representation.shape[1]
 
     # flatten
-    original_base_shape = base_representation.shape
-    if len(original_base_shape) == 2 or (
-        isinstance(intervention, LocalistRepresentationIntervention)
-    ) or intervention.keep_last_dim:
-        # no pos dimension, e.g., gru, or opt-out concate last two dims
-        base_representation_f = base_representation
-        source_representation_f = source_representation
-    elif len(original_base_shape) == 3:
-        # b, num_unit (pos), d -> b, num_unit*d
-        base_representation_f = bsd_to_b_sd(base_representation)
-        source_representation_f = bsd_to_b_sd(source_representation)
-    elif len(original_base_shape) == 4:
-        # b, num_unit (h), s, d -> b, s, num_unit*d
-        base_representation_f = bhsd_to_bs_hd(base_representation)
-        source_representation_f = bhsd_to_bs_hd(source_representation)
-    else:
-        assert False  # what's going on?
+    flatten_fn, unflatten_fn = _get_flatten_fns(
+        intervention, len(base_representation.shape)
+    )
+    base_representation_f = flatten_fn(base_representation)
+    source_representation_f = flatten_fn(source_representation)
 
     intervention_output = intervention(
         base_representation_f, source_representation_f, subspaces, **kwargs
@@ -503,17 +647,7 @@ def do_intervention(
     post_d = intervened_representation.shape[-1]
 
     # unflatten
-    if len(original_base_shape) == 2 or isinstance(
-        intervention, LocalistRepresentationIntervention
-    ) or intervention.keep_last_dim:
-        # no pos dimension, e.g., gru or opt-out concate last two dims
-        pass
-    elif len(original_base_shape) == 3:
-        intervened_representation = b_sd_to_bsd(intervened_representation, num_unit)
-    elif len(original_base_shape) == 4:
-        intervened_representation = bs_hd_to_bhsd(intervened_representation, num_unit)
-    else:
-        assert False  # what's going on?
+    intervened_representation = unflatten_fn(intervened_representation, num_unit)
 
     if not isinstance(intervention_output, InterventionOutput):
         return intervened_representation
@@ -522,6 +656,49 @@ def do_intervention(
     return intervention_output
 
 
+# opt-in compilation of the intervention path, set PYVENE_COMPILE_INTERVENTION=1.
+# the flag is read once at import time, so it must be set before `import pyvene`.
+# dynamic shapes avoid recompiling when batch size or unit counts change.
+if os.environ.get("PYVENE_COMPILE_INTERVENTION", "0") == "1":
+    do_intervention_compiled = torch.compile(
+        do_intervention, mode="reduce-overhead", dynamic=True
+    )
+else:
+    do_intervention_compiled = do_intervention
+
+
+def load_compile_cache_artifacts(path):
+    """Load torch.compile cache artifacts saved by a previous run, if any.
+
+    No-op unless PYVENE_COMPILE_INTERVENTION=1 was set before `import pyvene`.
+    """
+    if do_intervention_compiled is do_intervention or path is None:
+        return
+    if not hasattr(torch.compiler, "load_cache_artifacts"):
+        return  # requires torch>=2.7
+    if not os.path.exists(path):
+        return
+    with open(path, "rb") as f:
+        torch.compiler.load_cache_artifacts(f.read())
+
+
+def save_compile_cache_artifacts(path):
+    """Save torch.compile cache artifacts so later runs can skip tracing.
+
+    No-op unless PYVENE_COMPILE_INTERVENTION=1 was set before `import pyvene`.
+    """
+    if do_intervention_compiled is do_intervention or path is None:
+        return
+    if not hasattr(torch.compiler, "save_cache_artifacts"):
+        return  # requires torch>=2.7
+    artifacts = torch.compiler.save_cache_artifacts()
+    if artifacts is None:
+        return
+    artifact_bytes, _ = artifacts
+    with open(path, "wb") as f:
+        f.write(artifact_bytes)
+
+
 def simple_output_to_subcomponent(output, representation_type, model_config):
     """This is an oversimplied version for demo."""
     return output
@@ -536,8 +713,11 @@ def simple_scatter_intervention_output(
     model_config,
 ):
     """This is an oversimplied version for demo."""
-    for batch_i, locations in enumerate(unit_locations):
-        original_output[batch_i, locations] = intervened_representation[batch_i]
+    loc_idx = locations_to_index_tensor(unit_locations, original_output.device)
+    batch_idx = torch.arange(
+        loc_idx.shape[0], device=original_output.device
+    ).unsqueeze(1)
+    original_output[batch_idx, loc_idx] = intervened_representation
 
 
 def weighted_average(values, weights):
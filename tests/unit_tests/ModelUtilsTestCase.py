@@ -1,6 +1,9 @@
-import unittest
+import unittest, tempfile
+from unittest import mock
 from ..utils import *
 from pyvene.models.modeling_utils import *
+import pyvene.models.modeling_utils as modeling_utils
+import pyvene.models.intervenable_base as intervenable_base
 
 
 class ModelUtilsTestCase(unittest.TestCase):
@@ -28,6 +31,12 @@ class ModelUtilsTestCase(unittest.TestCase):
         tensor_output = gather_neurons(tensor_input, "h", [[0, 1]] * 5)
         self.assertTrue(torch.allclose(tensor_output, tensor_input[:, 0:2, :]))
 
+    def test_gather_neurons_batch_diff_positive(self):
+        tensor_input = torch.rand((2, 3, 2))  # batch_size, seq_len, emb_dim
+        tensor_output = gather_neurons(tensor_input, "pos", [[0, 1], [1, 2]])
+        self.assertTrue(torch.allclose(tensor_output[0], tensor_input[0, 0:2, :]))
+        self.assertTrue(torch.allclose(tensor_output[1], tensor_input[1, 1:3, :]))
+
     def test_gather_neurons_pos_h_positive(self):
         tensor_input = torch.rand((5, 4, 3, 2))  # batch_size, #heads, seq_len, emb_dim
         tensor_output = gather_neurons(
@@ -117,6 +126,62 @@ class ModelUtilsTestCase(unittest.TestCase):
         )
         self.assertTrue(torch.allclose(tensor_output, golden_output))
 
+    def test_simple_scatter_intervention_output_positive(self):
+        # batch_size, seq_len, emb_dim
+        original_output = torch.rand((2, 5, 6))
+        # batch_size, #locations, emb_dim
+        intervened_representation = torch.rand((2, 2, 6))
+        unit_locations = [[1, 3], [0, 4]]
+
+        # per-batch loop as the reference
+        golden_output = original_output.clone()
+        for batch_i, locations in enumerate(unit_locations):
+            golden_output[batch_i, locations] = intervened_representation[batch_i]
+
+        simple_scatter_intervention_output(
+            original_output,
+            intervened_representation,
+            "block_output",
+            "pos",
+            unit_locations,
+            self.gpt2_config,
+        )
+        self.assertTrue(torch.allclose(original_output, golden_output))
+
+    def test_scatter_neurons_after_inference_mode_positive(self):
+        # a scatter under inference mode must not leak inference tensors
+        # into later scatters that are saved for backward.
+        with torch.inference_mode():
+            scatter_neurons(
+                torch.rand((2, 5, 6)),
+                torch.rand((2, 2, 6)),
+                "attention_input",
+                "pos",
+                ([[1, 2]] * 2),
+                self.gpt2_model,
+                self.gpt2_config,
+                False,
+            )
+
+        tensor_input = torch.rand((2, 5, 6))
+        replacing_tensor_input = torch.rand((2, 2, 6), requires_grad=True)
+        tensor_output = scatter_neurons(
+            tensor_input,
+            replacing_tensor_input,
+            "attention_input",
+            "pos",
+            ([[1, 2]] * 2),
+            self.gpt2_model,
+            self.gpt2_config,
+            False,
+        )
+        tensor_output.sum().backward()
+        self.assertTrue(
+            torch.allclose(
+                replacing_tensor_input.grad, torch.ones_like(replacing_tensor_input)
+            )
+        )
+
     def test_scatter_gathered_neurons_gpt2_positive(self):
         # batch_size, seq_len, emb_dim
         replacing_tensor_input = torch.arange(60).view(2, 5, 6)
@@ -293,6 +358,36 @@ class ModelUtilsTestCase(unittest.TestCase):
         tensor_output = tensor_output.view((2, 5, 3, 2))
         self.assertTrue(torch.allclose(tensor_output, golden_output))
 
+    def test_scatter_neurons_gpt2_attn_with_head_batch_diff_positive(self):
+        # batch_size, seq_len, emb_dim
+        tensor_input = torch.arange(60).view(2, 5, 6)
+        # batch_size, #head, seq_len, emb_dim
+        replacing_tensor_input = torch.arange(60, 76).view(2, 2, 2, 2)
+        head_locations = [[0, 2], [1, 2]]
+        pos_locations = [[1, 3], [0, 4]]
+
+        # each batch replaces different heads at different positions
+        golden_output = tensor_input.clone().view(2, 5, 3, 2)
+        for batch_i in range(2):
+            for i, head in enumerate(head_locations[batch_i]):
+                for j, pos in enumerate(pos_locations[batch_i]):
+                    golden_output[batch_i, pos, head] = replacing_tensor_input[
+                        batch_i, i, j
+                    ]
+
+        tensor_output = scatter_neurons(
+            tensor_input,
+            replacing_tensor_input,
+            "head_attention_value_output",
+            "h.pos",
+            (head_locations, pos_locations),
+            self.gpt2_model,
+            self.gpt2_config,
+            False,
+        )
+        tensor_output = tensor_output.view((2, 5, 3, 2))
+        self.assertTrue(torch.allclose(tensor_output, golden_output))
+
     def test_scatter_gathered_neurons_gpt2_attn_with_head_positive(self):
         # batch_size, seq_len, emb_dim
         tensor_input = torch.arange(60).view(2, 5, 6)
@@ -326,11 +421,155 @@ class ModelUtilsTestCase(unittest.TestCase):
         tensor_output = tensor_output.view((2, 5, 3, 2))
         self.assertTrue(torch.allclose(tensor_output, golden_output))
 
+    def test_register_module_hook_remove_forward_hooks_positive(self):
+        main_module = nn.Sequential(nn.Linear(2, 2), nn.Linear(2, 2))
+        hook = lambda module, args, kwargs, output=None: None
+        register_module_hook(
+            main_module, main_module[0].register_forward_hook, hook, with_kwargs=True
+        )
+        register_module_hook(
+            main_module, main_module[1].register_forward_pre_hook, hook, with_kwargs=True
+        )
+        self.assertEqual(len(main_module[0]._forward_hooks), 1)
+        self.assertEqual(len(main_module[1]._forward_pre_hooks), 1)
+
+        remove_forward_hooks(main_module)
+        for submodule in main_module.modules():
+            self.assertEqual(len(submodule._forward_hooks), 0)
+            self.assertEqual(len(submodule._forward_pre_hooks), 0)
+
+    def test_remove_forward_hooks_untracked_positive(self):
+        # modules never hooked through register_module_hook get the full walk
+        main_module = nn.Sequential(nn.Linear(2, 2), nn.Linear(2, 2))
+        hook = lambda module, args, output: None
+        main_module[0].register_forward_hook(hook)
+        main_module[1].register_forward_pre_hook(lambda module, args: None)
+
+        remove_forward_hooks(main_module)
+        for submodule in main_module.modules():
+            self.assertEqual(len(submodule._forward_hooks), 0)
+            self.assertEqual(len(submodule._forward_pre_hooks), 0)
+
+    def test_weighted_average_tensor_positive(self):
+        # tensor metrics stay tensors
+        for n in (8, 32):
+            values = [torch.tensor(float(i % 4) / 4) for i in range(n)]
+            weights = [i + 1 for i in range(n)]
+            golden = sum(v * w for v, w in zip(values, weights)) / sum(weights)
+            output = weighted_average(values, weights)
+            self.assertTrue(isinstance(output, torch.Tensor))
+            self.assertTrue(torch.allclose(output, golden))
+
+    def test_weighted_average_negative(self):
+        with self.assertRaises(ValueError):
+            weighted_average([1.0, 2.0], [1])
+
+    def test_compile_cache_artifacts_round_trip_positive(self):
+        compiled = torch.compile(do_intervention, backend="eager")
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(
+            modeling_utils, "do_intervention_compiled", compiled
+        ), mock.patch.object(
+            torch.compiler,
+            "save_cache_artifacts",
+            return_value=(b"artifacts", None),
+            create=True,
+        ) as save_mock, mock.patch.object(
+            torch.compiler, "load_cache_artifacts", create=True
+        ) as load_mock:
+            path = os.path.join(tmp_dir, "compile_cache.bin")
+            save_compile_cache_artifacts(path)
+            save_mock.assert_called_once()
+            with open(path, "rb") as f:
+                self.assertEqual(f.read(), b"artifacts")
+
+            load_compile_cache_artifacts(path)
+            load_mock.assert_called_once_with(b"artifacts")
+
+    def test_compile_cache_artifacts_noop_positive(self):
+        compiled = torch.compile(do_intervention, backend="eager")
+        with tempfile.TemporaryDirectory() as tmp_dir, mock.patch.object(
+            torch.compiler, "save_cache_artifacts", return_value=None, create=True
+        ) as save_mock, mock.patch.object(
+            torch.compiler, "load_cache_artifacts", create=True
+        ) as load_mock:
+            path = os.path.join(tmp_dir, "compile_cache.bin")
+
+            # compilation is disabled, nothing is saved or loaded
+            with mock.patch.object(
+                modeling_utils, "do_intervention_compiled", do_intervention
+            ):
+                save_compile_cache_artifacts(path)
+                load_compile_cache_artifacts(path)
+            save_mock.assert_not_called()
+
+            with mock.patch.object(
+                modeling_utils, "do_intervention_compiled", compiled
+            ):
+                # no path
+                save_compile_cache_artifacts(None)
+                load_compile_cache_artifacts(None)
+                save_mock.assert_not_called()
+                # missing file
+                load_compile_cache_artifacts(path)
+                # nothing to save
+                save_compile_cache_artifacts(path)
+                save_mock.assert_called_once()
+            load_mock.assert_not_called()
+            self.assertFalse(os.path.exists(path))
+
+    def test_train_alignment_compile_cache_path_positive(self):
+        gpt2 = self.gpt2_model(self.gpt2_config)
+        config = IntervenableConfig(
+            model_type=type(gpt2),
+            representations=[RepresentationConfig(0, "block_output", "pos", 1)],
+            intervention_types=VanillaIntervention,
+        )
+        intervenable = IntervenableModel(config, gpt2)
+        with mock.patch.object(
+            intervenable_base, "load_compile_cache_artifacts"
+        ) as load_mock, mock.patch.object(
+            intervenable_base, "save_compile_cache_artifacts"
+        ) as save_mock:
+            intervenable.train_alignment(
+                [],
+                None,
+                None,
+                None,
+                epochs=1,
+                optimizer=mock.Mock(),
+                scheduler=mock.Mock(),
+                compile_cache_path="compile_cache.bin",
+            )
+        load_mock.assert_called_once_with("compile_cache.bin")
+        save_mock.assert_called_once_with("compile_cache.bin")
+
+    def test_intervention_setter_compiled_positive(self):
+        gpt2 = self.gpt2_model(self.gpt2_config).eval()
+        config = IntervenableConfig(
+            model_type=type(gpt2),
+            representations=[RepresentationConfig(0, "block_output", "pos", 1)],
+            intervention_types=VanillaIntervention,
+        )
+        intervenable = IntervenableModel(config, gpt2)
+        base = {"input_ids": torch.randint(0, 10, (2, 3))}
+        source = {"input_ids": torch.randint(0, 10, (2, 3))}
+        unit_locations = {"sources->base": ([[[1]] * 2], [[[1]] * 2])}
+        _, golden_output = intervenable(base, [source], unit_locations)
+
+        compiled = torch.compile(do_intervention, backend="eager")
+        with mock.patch.object(
+            intervenable_base, "do_intervention_compiled", wraps=compiled
+        ) as compiled_mock:
+            _, out_output = intervenable(base, [source], unit_locations)
+        self.assertTrue(compiled_mock.called)
+        self.assertTrue(torch.allclose(out_output.logits, golden_output.logits))
+
 
 def suite():
     suite = unittest.TestSuite()
     suite.addTest(ModelUtilsTestCase("test_gather_neurons_pos_h_positive"))
     suite.addTest(ModelUtilsTestCase("test_gather_neurons_positive"))
+    suite.addTest(ModelUtilsTestCase("test_gather_neurons_batch_diff_positive"))
     suite.addTest(ModelUtilsTestCase("test_scatter_gathered_neurons_gpt2_positive"))
     suite.addTest(ModelUtilsTestCase("test_scatter_gathered_neurons_gpt2_qkv_positive"))
     suite.addTest(
@@ -347,12 +586,37 @@ def suite():
     suite.addTest(
         ModelUtilsTestCase("test_scatter_neurons_gpt2_qkv_all_heads_positive")
     )
+    suite.addTest(
+        ModelUtilsTestCase("test_scatter_neurons_gpt2_attn_with_head_batch_diff_positive")
+    )
     suite.addTest(
         ModelUtilsTestCase("test_scatter_neurons_gpt2_batch_diff_no_head_positive")
     )
     suite.addTest(
         ModelUtilsTestCase("test_output_to_subcomponent_gpt2_no_head_positive")
     )
+    suite.addTest(ModelUtilsTestCase("test_weighted_average_tensor_positive"))
+    suite.addTest(ModelUtilsTestCase("test_weighted_average_negative"))
+    suite.addTest(
+        ModelUtilsTestCase("test_simple_scatter_intervention_output_positive")
+    )
+    suite.addTest(
+        ModelUtilsTestCase("test_register_module_hook_remove_forward_hooks_positive")
+    )
+    suite.addTest(
+        ModelUtilsTestCase("test_remove_forward_hooks_untracked_positive")
+    )
+    suite.addTest(
+        ModelUtilsTestCase("test_scatter_neurons_after_inference_mode_positive")
+    )
+    suite.addTest(
+        ModelUtilsTestCase("test_compile_cache_artifacts_round_trip_positive")
+    )
+    suite.addTest(ModelUtilsTestCase("test_compile_cache_artifacts_noop_positive"))
+    suite.addTest(
+        ModelUtilsTestCase("test_train_alignment_compile_cache_path_positive")
+    )
+    suite.addTest(ModelUtilsTestCase("test_intervention_setter_compiled_positive"))
     # TODO: Add scatter_neurons() tests to GRU and other models
     return suite
 